@@ -8,11 +8,32 @@ Created on Sat May  2 08:34:49 2020
 
 import random
 import os
+from abc import ABC, abstractmethod
 from PIL import ImageTk, Image
 import tkinter as tk
 import tkinter.messagebox as msg
 
 CARDS_FOLDER = os.path.join(os.getcwd(), "cards")
+FRAME_DELAY = 16 # Milliseconds between card moves while dragging
+SUITS = ["Spades", "Clubs", "Hearts", "Diamonds"]
+VALUES = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+AK47_VALUES = ["A", "K", "4", "7"]
+
+def encode_card(card):
+    '''
+    Encodes a card as an integer for array-based strategies.
+    card (Card): A card.
+    Returns (int) the card's code, suit index * 13 + value index.
+    '''
+    return SUITS.index(card.suit) * len(VALUES) + VALUES.index(card.value)
+
+def card_code_value(code):
+    '''
+    Gets the value index of an encoded card.
+    code (int): The card's code.
+    Returns (int) the index of the card's value in VALUES.
+    '''
+    return code % len(VALUES)
 
 class Card:
     '''
@@ -91,9 +112,7 @@ class DrawPile(DiscardPile):
         if other_cards:
             self.cards = other_cards
         else:
-            self.cards = [Card(s, v) for s in ["Spades", "Clubs", "Hearts", "Diamonds"] 
-                                    for v in ["A", "2", "3", "4", "5", "6", "7", "8", 
-                                    "9", "10", "J", "Q", "K"]]
+            self.cards = [Card(s, v) for s in SUITS for v in VALUES]
             
     def deal_player_cards(self):
         '''
@@ -161,7 +180,7 @@ class Hand:
         has_ak47 = False
         if len(card_values) == 4:
             for card_value in card_values:
-                if card_value in ["A", "K", "4", "7"]:
+                if card_value in AK47_VALUES:
                     has_ak47 = True
                 else:
                     has_ak47 = False
@@ -170,60 +189,157 @@ class Hand:
                 return True
         return False
     
+class Strategy(ABC):
+    '''
+    Defines a batched decision strategy for computer hands.
+    Each state is a hand encoded as a list of card codes (see encode_card),
+    so the decisions of many games can be made in a single call.
+    '''
+    @abstractmethod
+    def need_discarded_cards(self, hands, discarded_cards):
+        '''
+        Decides whether each hand needs the card on top of the discard pile.
+        hands (list of lists of int): The encoded hands.
+        discarded_cards (list of int): The encoded discarded card for each hand.
+        Returns (list of bool) a decision for each hand.
+        '''
+    
+    @abstractmethod
+    def choose_drops(self, hands):
+        '''
+        Decides which card each hand drops.
+        hands (list of lists of int): The encoded hands, drawn card included.
+        Returns (list of int) the position of the card to drop in each hand.
+        '''
+    
+class AK47Strategy(Strategy):
+    '''
+    Defines the default strategy: keep A, K, 4 and 7, drop anything else
+    or a repeated value.
+    '''
+    AK47_INDICES = frozenset(VALUES.index(value) for value in AK47_VALUES)
+    
+    def need_discarded_cards(self, hands, discarded_cards):
+        decisions = []
+        for hand, discarded_card in zip(hands, discarded_cards):
+            if discarded_card in hand:
+                decisions.append(False)
+            else:
+                decisions.append(card_code_value(discarded_card) in self.AK47_INDICES)
+        return decisions
+    
+    def choose_drops(self, hands):
+        return [self.choose_drop(hand) for hand in hands]
+    
+    def choose_drop(self, hand):
+        '''
+        Decides which card a single hand drops.
+        hand (list of int): The encoded hand.
+        Returns (int) the position of the card to drop, None if there is none.
+        '''
+        values = [card_code_value(code) for code in hand]
+        
+        # Play if has a playable card
+        for index, value in enumerate(values):
+            if value not in self.AK47_INDICES:
+                return index
+            
+        # Play if has no playable card but a repeated card
+        for index, value in enumerate(values):
+            if values.count(value) > 1:
+                return index
+    
+DEFAULT_STRATEGY = AK47Strategy()
+
 class Computer(Hand):
     '''
     Defines the computer's hand.
     '''
-    def __init__(self, cards):
+    def __init__(self, cards, strategy=None):
         super().__init__(cards)
+        self.strategy = strategy if strategy is not None else DEFAULT_STRATEGY
         
     def need_discarded_card(self, discarded_card):
-        if discarded_card in self.cards:
-            return False
-        elif discarded_card.value in ["A", "K", "4", "7"]:
-            return True
-        else:
-            return False
-        
-    def num_of_value_occurrences(self):
         '''
-        Gets the number of occurrences of cards with the same value.
-        Returns (dict) each value with the number of occurrences.
+        Checks if the computer needs the discarded card.
+        Returns True if it does, False otherwise.
         '''
-        cards_occurrence = {}
-        for card in self.cards:
-            cards_occurrence[card.value] = len([c for c in self.cards if c.value == card.value])
-        return cards_occurrence
-    
-    def card_with_value(self, value):
-        '''
-        Gets the card with the specified value.
-        Returns (Card object) a card with the value specified.
-        '''
-        for index, card in enumerate(self.cards):
-            if card.value == value:
-                card_with_value = self.drop_card(index)
-                return card_with_value
+        return computers_need_discarded_cards([self], [discarded_card])[0]
         
     def play(self, drawn_card):
         '''
         Defines how the computer plays.
         Returns (Card object) the card played.
         '''
-        # First add card to the hand
-        self.cards.append(drawn_card)
-        
-        # Play if has a playable card
-        for index, card in enumerate(self.cards):
-            if card.value not in ["A", "K", "4", "7"]:
-                dropped = self.drop_card(index)
-                return dropped
+        return computers_play([self], [drawn_card])[0]
+    
+    def encode_hand(self):
+        '''
+        Encodes the hand for the strategy.
+        Returns (list of int) the codes of the cards in the hand.
+        '''
+        return [encode_card(card) for card in self.cards]
+    
+def group_by_strategy(computers):
+    '''
+    Groups computers sharing the same strategy.
+    computers (list of Computer): The computers to group.
+    Returns (list of tuples) each strategy with the positions of its computers.
+    '''
+    groups = {}
+    for position, computer in enumerate(computers):
+        strategy = computer.strategy
+        groups.setdefault(id(strategy), (strategy, []))[1].append(position)
+    return list(groups.values())
+
+def check_num_of_results(strategy, results, positions):
+    '''
+    Checks that a strategy returned one result for each hand of its batch.
+    Raises ValueError if it did not.
+    '''
+    if len(results) != len(positions):
+        raise ValueError("{} returned {} results for {} hands".format(
+            type(strategy).__name__, len(results), len(positions)))
+
+def computers_need_discarded_cards(computers, discarded_cards):
+    '''
+    Checks if each computer needs its discarded card, one batch per strategy.
+    computers (list of Computer): The computers, possibly from different games.
+    discarded_cards (list of Card): The discarded card for each computer.
+    Returns (list of bool) a decision for each computer.
+    '''
+    decisions = [False] * len(computers)
+    for strategy, positions in group_by_strategy(computers):
+        hands = [computers[i].encode_hand() for i in positions]
+        codes = [encode_card(discarded_cards[i]) for i in positions]
+        results = list(strategy.need_discarded_cards(hands, codes))
+        check_num_of_results(strategy, results, positions)
+        for i, decision in zip(positions, results):
+            decisions[i] = bool(decision)
+    return decisions
+
+def computers_play(computers, drawn_cards):
+    '''
+    Makes each computer play its drawn card, one batch per strategy.
+    The hands are only changed once every strategy has decided.
+    computers (list of Computer): The computers, possibly from different games.
+    drawn_cards (list of Card): The drawn card for each computer.
+    Returns (list of Card) the card played by each computer.
+    '''
+    drops = [None] * len(computers)
+    for strategy, positions in group_by_strategy(computers):
+        hands = [computers[i].encode_hand() + [encode_card(drawn_cards[i])] for i in positions]
+        results = list(strategy.choose_drops(hands))
+        check_num_of_results(strategy, results, positions)
+        for i, index in zip(positions, results):
+            drops[i] = index
             
-        # Play if has no playable card but a repeated card
-        value_occurrences = self.num_of_value_occurrences()
-        for value in value_occurrences:
-            if value_occurrences[value] > 1:
-                return self.card_with_value(value)
+    dropped = [None] * len(computers)
+    for i, (computer, drawn_card) in enumerate(zip(computers, drawn_cards)):
+        computer.add_card(drawn_card)
+        if drops[i] is not None:
+            dropped[i] = computer.drop_card(int(drops[i]))
+    return dropped
 
 class GameGui(tk.Tk):
     def __init__(self):
@@ -240,8 +356,7 @@ class GameGui(tk.Tk):
         
         self.player_points = 0
         self.computer_points = 0
-        self.player_points_string = tk.StringVar()
-        self.computer_points_string = tk.StringVar()
+        self.card_images = {}
         
         self.create_game_screen()
         
@@ -249,15 +364,19 @@ class GameGui(tk.Tk):
         '''
         Creates the game screen.
         '''
-        # Create the game screen
-        self.game_screen = tk.Frame(self, width=800, height=600, bg="green")
-        self.game_screen.pack_propagate(0)
+        # Create the game screen, the whole board is drawn on a single canvas
+        self.game_screen = tk.Canvas(self, width=800, height=600, bg="green", highlightthickness=0)
+        self.compute_layout()
         
-        # Create the points labels
-        self.player_points_string.set("Player points: " + str(self.player_points))
-        self.computer_points_string.set("Computer points: " + str(self.computer_points))
-        self.player_points_label = tk.Label(self.game_screen, textvar=self.player_points_string, font="Arial 15 bold", fg="white", bg="green")
-        self.comp_points_label = tk.Label(self.game_screen, textvar=self.computer_points_string, font="Arial 15 bold", fg="white", bg="green")
+        # Create the points texts
+        self.game_screen.create_text(self.game_screen.winfo_reqwidth() - 20, self.game_screen.winfo_reqheight() - 15,
+                                     text="Player points: " + str(self.player_points), font="Arial 15 bold", fill="white", anchor=tk.SE)
+        self.game_screen.create_text(20, 15, text="Computer points: " + str(self.computer_points), font="Arial 15 bold", fill="white", anchor=tk.NW)
+        
+        # Bind the cards' events once, they apply to every item with the tag
+        self.game_screen.tag_bind("draw_pile", "<Button-1>", self.draw_card)
+        self.game_screen.tag_bind("discard_pile", "<Button-1>", self.pick_discarded_card)
+        self.make_dragable("player_card")
         
         # Create the draw pile, hands and discard pile
         self.draw_pile = DrawPile()
@@ -266,104 +385,109 @@ class GameGui(tk.Tk):
         self.computer = Computer(self.draw_pile.deal_player_cards())
         self.discard_pile = DiscardPile()
         
-        # Display the cards and points labels
+        # Display the cards
         self.display_computer_cards()
         self.display_draw_pile()
         self.display_discard_pile(f_time=True)
-        self.display_player_cards(f_time=True)
-        self.player_points_label.pack(side=tk.RIGHT, anchor=tk.S, padx=(0, 20), pady=(0, 15))
-        self.comp_points_label.pack(side=tk.LEFT, anchor=tk.N, padx=(20, 0), pady=(15, 0))
+        self.display_player_cards()
         
         self.card_drawn = False
+        self.drag_item = None
+        self.drag_position = None
+        self.drag_update = None
         self.game_screen.pack(side=tk.LEFT, anchor=tk.N)
         
+    def compute_layout(self):
+        '''
+        Computes the positions of the piles, the hands and the drop zone.
+        '''
+        back_image = self.card_image("back.png")
+        self.card_width = back_image.width()
+        self.card_height = back_image.height()
+        self.card_spacing = 30
+        
+        screen_width = self.game_screen.winfo_reqwidth()
+        screen_height = self.game_screen.winfo_reqheight()
+        occupied_space = (self.card_height * 2) + 100
+        remaining_window_space = screen_height - occupied_space
+        self.piles_y = self.card_height + (remaining_window_space // 2)
+        self.draw_pile_x = 100
+        self.discard_pile_x = screen_width - (self.card_width + 100)
+        self.computer_cards_y = 50
+        self.player_cards_y = screen_height - (self.card_height + 50)
+        
+        # A card is dropped when it overlaps the discard pile
+        self.drop_zone = (self.discard_pile_x - self.card_width, self.piles_y - self.card_height,
+                          self.discard_pile_x + self.card_width, self.piles_y + self.card_height)
+        
+    def card_image(self, card_name):
+        '''
+        Loads a card's image, each image is only loaded once.
+        card_name (str): The name of the card's image.
+        Returns (PhotoImage) the card's image.
+        '''
+        if card_name not in self.card_images:
+            self.card_images[card_name] = ImageTk.PhotoImage(Image.open(CARDS_FOLDER + "/" + card_name))
+        return self.card_images[card_name]
+    
+    def hand_x_start(self, num_of_cards):
+        '''
+        Gets the x position of the first card to center a hand horizontally.
+        num_of_cards (int): The number of cards in the hand.
+        Returns (float) the x position of the first card.
+        '''
+        cards_length = ((num_of_cards - 1) * self.card_spacing) + self.card_width
+        remaining_window_space = self.game_screen.winfo_reqwidth() - cards_length
+        return remaining_window_space / 2
+        
     def display_computer_cards(self, reveal_cards=False):
         '''
         Displays the computer cards.
         '''
+        self.game_screen.delete("computer_card")
         computer_cards = self.computer.get_cards()
-        if reveal_cards:
-            card_image_names = [self.card_png_name(card) for card in computer_cards]
-            self.computer_card_images = [ImageTk.PhotoImage(Image.open(CARDS_FOLDER + "/" + card_name)) for card_name in card_image_names]
-        else:
-            self.computer_card_images = [ImageTk.PhotoImage(Image.open(CARDS_FOLDER + "/back.png")) for i in range(len(computer_cards))]
-        self.computer_card_image_labels = [tk.Label(self.game_screen, image=card_image) for card_image in self.computer_card_images]
+        x_start = self.hand_x_start(len(computer_cards))
         
-        # Centering the cards horizontally
-        card_width = self.computer_card_image_labels[0].winfo_reqwidth()
-        card_spacing = 30
-        cards_length = ((len(computer_cards) - 1) * card_spacing) + card_width
-        remaining_window_space = self.game_screen.winfo_reqwidth() - cards_length
-        x_start = remaining_window_space / 2
-        
-        for index, card_image_label in enumerate(self.computer_card_image_labels):
-            pad = index * card_spacing
-            card_image_label.place(x=x_start+pad, y=50)
+        for index, card in enumerate(computer_cards):
+            card_name = self.card_png_name(card) if reveal_cards else "back.png"
+            pad = index * self.card_spacing
+            self.game_screen.create_image(x_start+pad, self.computer_cards_y, image=self.card_image(card_name),
+                                          anchor=tk.NW, tags="computer_card")
     
     def display_draw_pile(self):
         '''
         Displays the draw pile.
         '''
-        self.draw_pile_png = ImageTk.PhotoImage(Image.open(CARDS_FOLDER + "/back.png"))
-        self.draw_pile_label = tk.Label(self.game_screen, image=self.draw_pile_png)
-        self.draw_pile_label.bind("<Button-1>", self.draw_card)
-        
-        card_height = self.draw_pile_label.winfo_reqheight()
-        occupied_space = (card_height * 2) + 100
-        remaining_window_space = self.game_screen.winfo_reqheight() - occupied_space
-        y = card_height + (remaining_window_space / 2)
-        
-        self.draw_pile_label.place(x=100, y=y)
+        self.game_screen.create_image(self.draw_pile_x, self.piles_y, image=self.card_image("back.png"),
+                                      anchor=tk.NW, tags="draw_pile")
     
     def display_discard_pile(self, f_time=False):
         '''
         Displays the discard pile.
         '''
-        if f_time:
-            self.discard_pile_label = tk.Canvas(self.game_screen, width=82, height=113, bg="grey")
+        self.game_screen.delete("discard_pile")
+        top_card = self.discard_pile.get_top_card()
+        if f_time or not top_card:
+            self.game_screen.create_rectangle(self.discard_pile_x, self.piles_y, self.discard_pile_x + self.card_width,
+                                              self.piles_y + self.card_height, fill="grey", tags="discard_pile")
         else:
-            self.discard_pile_label.destroy()
-            top_card_png_name = self.card_png_name(self.discard_pile.get_top_card())
-            self.discard_pile_png = ImageTk.PhotoImage(Image.open(CARDS_FOLDER + "/" + top_card_png_name))
-            self.discard_pile_label = tk.Label(self.game_screen, image=self.discard_pile_png)
-            
-        card_height = self.draw_pile_label.winfo_reqheight()
-        card_width = self.discard_pile_label.winfo_reqwidth()
-        occupied_space = (card_height * 2) + 100
-        remaining_window_space = self.game_screen.winfo_reqheight() - occupied_space        
-        x = self.game_screen.winfo_reqwidth() - (card_width + 100)
-        y = card_height + (remaining_window_space // 2)
-        
-        self.discard_pile_label.bind("<Button-1>", self.pick_discarded_card)
-        self.discard_pile_label.place(x=x, y=y)
+            self.game_screen.create_image(self.discard_pile_x, self.piles_y, image=self.card_image(self.card_png_name(top_card)),
+                                          anchor=tk.NW, tags="discard_pile")
     
-    def display_player_cards(self, f_time=False):
+    def display_player_cards(self):
         '''
         Displays the player cards.
         '''
-        # Destroy the images if they already exist
-        if not f_time:
-            for label in self.player_card_image_labels:
-                label.destroy()
-                
+        self.game_screen.delete("player_card")
         player_cards = self.player.get_cards()
-        card_image_names = [self.card_png_name(card) for card in player_cards]
-        self.player_card_images = [ImageTk.PhotoImage(Image.open(CARDS_FOLDER + "/" + card_name)) for card_name in card_image_names]
-        self.player_card_image_labels = [tk.Label(self.game_screen, image=card_image) for card_image in self.player_card_images]
-        
-        # Centering the cards horizontally
-        card_width = self.player_card_image_labels[0].winfo_reqwidth()
-        card_height = self.player_card_image_labels[0].winfo_reqheight()
-        card_spacing = 30
-        cards_length = ((len(player_cards) - 1) * card_spacing) + card_width
-        remaining_window_space = self.game_screen.winfo_reqwidth() - cards_length
-        x_start = remaining_window_space / 2
-        y_start = self.game_screen.winfo_reqheight() - (card_height + 50)
-        
-        for index, card_image_label in enumerate(self.player_card_image_labels):
-            self.make_dragable(card_image_label)
-            pad = index * card_spacing
-            card_image_label.place(x=x_start+pad, y=y_start)
+        x_start = self.hand_x_start(len(player_cards))
+        
+        self.player_card_items = []
+        for index, card in enumerate(player_cards):
+            pad = index * self.card_spacing
+            item = self.game_screen.create_image(x_start+pad, self.player_cards_y, image=self.card_image(self.card_png_name(card)),
+                                                 anchor=tk.NW, tags="player_card")
+            self.player_card_items.append(item)
     
     def card_png_name(self, card):
         '''
@@ -434,8 +558,6 @@ class GameGui(tk.Tk):
             new_hand = msg.askquestion("Hand over!", message + " with " + str(points) + " points. Play another hand?")
             
             if new_hand == "yes":
-                self.player_points_string.set("Player points: " + str(self.player_points))
-                self.computer_points_string.set("Computer points: " + str(self.computer_points))
                 self.game_screen.destroy()
                 self.create_game_screen()
             else:
@@ -455,8 +577,6 @@ class GameGui(tk.Tk):
         new_game = msg.askquestion("Game over!", message + ". Play a new game?")
         if new_game == "yes":
             self.player_points, self.computer_points = 0, 0
-            self.player_points_string.set("Player points: " + str(self.player_points))
-            self.computer_points_string.set("Computer points: " + str(self.computer_points))
             self.game_screen.destroy()
             self.create_game_screen()
         else:
@@ -467,41 +587,72 @@ class GameGui(tk.Tk):
         '''
         Triggered when the card is clicked.
         '''
-        widget = event.widget
-        widget._drag_start_x = event.x
-        widget._drag_start_y = event.y
+        self.drag_item = self.game_screen.find_withtag("current")[0]
+        self.drag_position = None
         
         # Card's original coords
-        self.original_x = widget.winfo_x()
-        self.original_y = widget.winfo_y()
+        original_x, original_y = self.game_screen.coords(self.drag_item)
+        self.drag_start_x = event.x - original_x
+        self.drag_start_y = event.y - original_y
+        self.game_screen.tag_raise(self.drag_item)
         
     def on_drag_motion(self, event):
         '''
         Triggered when the card is dragged across the window.
+        The card is only moved once per frame, see update_drag.
         '''
-        widget = event.widget
-        x = widget.winfo_x() - widget._drag_start_x + event.x
-        y = widget.winfo_y() - widget._drag_start_y + event.y
+        if self.drag_item is None:
+            return
         
         if self.card_drawn:
+            x = event.x - self.drag_start_x
+            y = event.y - self.drag_start_y
             # Define the window boundary of the drag and drop
-            x_boundary = 800 - widget.winfo_width()
-            y_boundary = 600 - widget.winfo_height()
+            x_boundary = self.game_screen.winfo_reqwidth() - self.card_width
+            y_boundary = self.game_screen.winfo_reqheight() - self.card_height
             if (x > 0 and x < x_boundary) and (y > 0 and y < y_boundary):
-                widget.place(x=x, y=y)
+                self.drag_position = (x, y)
+                if self.drag_update is None:
+                    self.drag_update = self.after(FRAME_DELAY, self.update_drag)
         else:
+            # Stop the drag and put the raised card back in its stacking order
+            self.drag_item = None
+            self.display_player_cards()
             msg.showerror("AK47", "Draw a card first before you can make a drop.")
             
+    def update_drag(self):
+        '''
+        Moves the dragged card to the latest position of the pointer.
+        '''
+        self.drag_update = None
+        if self.drag_item is not None and self.drag_position:
+            self.game_screen.coords(self.drag_item, *self.drag_position)
+            
+    def in_drop_zone(self, x, y):
+        '''
+        Checks if a card at the position is over the discard pile.
+        Returns True if it is, False otherwise.
+        '''
+        x1, y1, x2, y2 = self.drop_zone
+        return (x > x1 and x < x2) and (y > y1 and y < y2)
+            
     def on_drag_release(self, event):
         '''
         Triggered when the card is released.
         '''
-        widget = event.widget
-        x = widget.winfo_x()
-        y = widget.winfo_y()
+        if self.drag_item is None:
+            return
         
-        if (x > 546 and x < 690) and (y > 147 and y < 353):
-            card_position = self.player_card_image_labels.index(widget)
+        # Apply the last pending move before checking the drop
+        if self.drag_update is not None:
+            self.after_cancel(self.drag_update)
+        self.update_drag()
+        item = self.drag_item
+        self.drag_item = None
+        x, y = self.game_screen.coords(item)
+        
+        if self.in_drop_zone(x, y):
+            card_position = self.player_card_items.index(item)
             dropped_card = self.player.drop_card(card_position)
             self.discard_pile.add_card(dropped_card)
             self.display_discard_pile()
@@ -531,12 +682,13 @@ class GameGui(tk.Tk):
             if self.computer.hand_over():
                 self.hand_over("computer")
         else:
-            widget.place(x=self.original_x, y=self.original_y)
+            # Redraw the hand to put the card back in its slot and stacking order
+            self.display_player_cards()
             
-    def make_dragable(self, widget):
+    def make_dragable(self, tag):
         '''
-        Makes the card draggable.
+        Makes the cards with the tag draggable.
         '''
-        widget.bind("<Button-1>", self.on_drag_start)
-        widget.bind("<B1-Motion>", self.on_drag_motion)
-        widget.bind("<ButtonRelease-1>", self.on_drag_release)
\ No newline at end of file
+        self.game_screen.tag_bind(tag, "<Button-1>", self.on_drag_start)
+        self.game_screen.tag_bind(tag, "<B1-Motion>", self.on_drag_motion)
+        self.game_screen.tag_bind(tag, "<ButtonRelease-1>", self.on_drag_release)
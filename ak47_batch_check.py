@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:05 2026
+
+@author: silasjimmy
+
+Checks that batched computer decisions match one decision per computer.
+"""
+
+import random
+from AK47 import DrawPile, Computer, AK47Strategy, card_code_value, computers_play, computers_need_discarded_cards
+
+NUM_OF_GAMES = 200
+
+class DropLastStrategy(AK47Strategy):
+    '''
+    Defines a strategy that drops the last playable card instead of the first.
+    '''
+    def choose_drop(self, hand):
+        for index in reversed(range(len(hand))):
+            if card_code_value(hand[index]) not in self.AK47_INDICES:
+                return index
+        return super().choose_drop(hand)
+
+def deal_games(seed):
+    '''
+    Deals a computer hand, a drawn card and a discarded card for each game.
+    seed (int): The seed of the shuffles.
+    Returns (list of tuples) the cards of each game.
+    '''
+    random.seed(seed)
+    games = []
+    for game in range(NUM_OF_GAMES):
+        draw_pile = DrawPile()
+        draw_pile.shuffle()
+        cards = draw_pile.deal_player_cards()
+        games.append((cards, draw_pile.draw_card(), draw_pile.draw_card()))
+    return games
+
+def create_computers(games, strategies):
+    '''
+    Creates a computer for each game, taking turns with the strategies.
+    Returns (list of Computer) the computers.
+    '''
+    return [Computer(list(cards), strategies[i % len(strategies)]) for i, (cards, drawn, discarded) in enumerate(games)]
+
+def check_batch():
+    '''
+    Runs every game in one batch and each game on its own, and compares them.
+    '''
+    games = deal_games(47)
+    strategies = [AK47Strategy(), AK47Strategy(), DropLastStrategy()]
+    drawn_cards = [drawn for cards, drawn, discarded in games]
+    discarded_cards = [discarded for cards, drawn, discarded in games]
+
+    batch_computers = create_computers(games, strategies)
+    batch_needs = computers_need_discarded_cards(batch_computers, discarded_cards)
+    batch_dropped = computers_play(batch_computers, drawn_cards)
+
+    scalar_computers = create_computers(games, strategies)
+    scalar_needs = [computer.need_discarded_card(card) for computer, card in zip(scalar_computers, discarded_cards)]
+    scalar_dropped = [computer.play(card) for computer, card in zip(scalar_computers, drawn_cards)]
+
+    assert batch_needs == scalar_needs, "Batched discard decisions differ"
+    assert batch_dropped == scalar_dropped, "Batched drops differ"
+    for batch_computer, scalar_computer in zip(batch_computers, scalar_computers):
+        assert batch_computer.get_cards() == scalar_computer.get_cards(), "Batched hands differ"
+        assert len(batch_computer.get_cards()) == 4, "A hand was left with the wrong number of cards"
+    print("Batch of", NUM_OF_GAMES, "games with", len(strategies), "strategies matches the single decisions.")
+
+if __name__ == "__main__":
+    check_batch()